@@ -0,0 +1,151 @@
+"""Регрессионные тесты ai_validator: python -m pytest tools (или python -m unittest из tools/)."""
+import json, os, pathlib, sys, tempfile, unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import ai_validator as av
+
+
+def write_files(root, files):
+    for rel, content in files.items():
+        path = pathlib.Path(root, rel)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+
+def run_report(root, dist, logs=None, mocks=None, **kwargs):
+    out_json = os.path.join(root, "out", "report.json")
+    os.makedirs(os.path.dirname(out_json), exist_ok=True)
+    av.generate_report(dist, os.path.join(dist, "mirrorIndex.json"), mocks, logs, out_json,
+                       out_json[:-5] + ".md", cache_dir=None, **kwargs)
+    with open(out_json, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class MalformedLogUrlTest(unittest.TestCase):
+    def test_invalid_ipv6_url_in_capture_log(self):
+        with tempfile.TemporaryDirectory() as root:
+            dist = os.path.join(root, "dist")
+            write_files(dist, {"index.html": '<script src="js/main.js"></script>', "js/main.js": "var a = 1;"})
+            logs = os.path.join(root, "logs")
+            write_files(logs, {"capture-1.ndjson": "\n".join(json.dumps(ev) for ev in (
+                {"ev": "request", "url": "http://localhost/js/main.js"},
+                {"ev": "requestfailed", "url": "http://[::1/x"},
+            )) + "\n"})
+            report = run_report(root, dist, logs)
+            self.assertTrue(os.path.exists(os.path.join(root, "out", "report.md")))
+            self.assertEqual(report["precache_plan"]["unmapped_requests"], 1)
+
+
+class ResponseStatsTest(unittest.TestCase):
+    def test_malformed_response_url_keeps_rest_of_diag(self):
+        with tempfile.TemporaryDirectory() as root:
+            diag = os.path.join(root, "diag.json")
+            with open(diag, 'w', encoding='utf-8') as f:
+                json.dump({"responses": [{"url": "http://[::1/x", "status": 200},
+                                         {"url": "https://a.com/ok", "status": 200}]}, f)
+            logs = av.analyze_logs(diag, url_csv=os.path.join(root, "url_stats.csv"))
+            self.assertFalse(logs.get("parse_errors"))
+            hosts = logs["response_stats"]["hosts"]
+            self.assertEqual(hosts["a.com"]["count"], 1)
+            self.assertEqual(hosts[av.INVALID_HOST]["count"], 1)
+
+
+class MockIndexTest(unittest.TestCase):
+    def test_loose_lookup_matches_stored_keys_like_service_worker(self):
+        index = av.MockIndex([{"key": "GET|/v1|t=5|"}, {"key": "GET|/v2||"}])
+        self.assertEqual(index.lookup("GET", "https://api.example.com/v1?t=5"), "hit")
+        # SW: createMockKey(method, normalizeUrlLoose(url)) по ключам normUrl — t=5 в ключе остаётся
+        self.assertEqual(index.lookup("GET", "https://api.example.com/v1?t=7"), "miss")
+        self.assertEqual(index.lookup("GET", "https://api.example.com/v2?t=7"), "loose_hit")
+
+
+class MockCoverageTest(unittest.TestCase):
+    def test_malformed_url_counts_as_miss(self):
+        with tempfile.TemporaryDirectory() as root:
+            diag = os.path.join(root, "diag.json")
+            with open(diag, 'w', encoding='utf-8') as f:
+                json.dump({"responses": [{"url": "http://[::1/x", "status": 200},
+                                         {"url": "https://api.example.com/v1", "status": 200}],
+                           "externalBlocked": ["http://[bad/y"]}, f)
+            coverage = av.MockCoverage(av.MockIndex([{"key": "GET|/v1||"}]))
+            logs = av.analyze_logs(diag, url_csv=os.path.join(root, "url_stats.csv"), coverage=coverage)
+            self.assertFalse(logs.get("parse_errors"))
+            result = coverage.result()
+            self.assertEqual((result["hit"], result["miss"]), (1, 2))
+            self.assertEqual(result["top_uncovered"], [{"endpoint": f"GET {av.INVALID_HOST}", "count": 2}])
+
+
+class WatchIncrementalTest(unittest.TestCase):
+    def test_unchanged_file_is_not_rescanned(self):
+        with tempfile.TemporaryDirectory() as root:
+            dist = os.path.join(root, "dist")
+            write_files(dist, {
+                "index.html": '<script src="js/a.js"></script><script src="js/b.js"></script>',
+                "js/a.js": 'fetch("https://a.example.com/x");',
+                "js/b.js": 'fetch("https://b.example.com/y"); var img = "img/new.png";',
+            })
+            scanned = []
+            real_scan_text = av.scan_text
+
+            def counting_scan_text(text, rel_path, ext, line_index=None):
+                scanned.append(rel_path)
+                return real_scan_text(text, rel_path, ext, line_index)
+
+            memo = av.StageMemo()
+            try:
+                with mock.patch.object(av, "scan_text", counting_scan_text):
+                    inventory, changes = av.refresh_inventory(dist)
+                    run_report(root, dist, inventory=inventory, memo=memo, watch_stats=changes)
+                    self.assertEqual(sorted(scanned), ["index.html", "js/a.js", "js/b.js"])
+                    scanned.clear()
+                    write_files(dist, {"js/a.js": 'fetch("https://c.example.com/z");', "img/new.png": "png"})
+                    inventory, changes = av.refresh_inventory(dist, inventory)
+                    report = run_report(root, dist, inventory=inventory, memo=memo, watch_stats=changes)
+            finally:
+                memo.hit_store.close()
+            self.assertEqual(scanned, ["js/a.js"])
+            self.assertEqual(changes["dependents"], ["index.html", "js/b.js"])
+            self.assertEqual(report["path_issues"], [])
+            self.assertEqual(sorted(h["host"] for h in report["external_dependencies"]["top_hosts"]),
+                             ["b.example.com", "c.example.com"])
+
+
+class TransferAuditTest(unittest.TestCase):
+    def run_counting(self, **kwargs):
+        estimated = []
+        real_estimator, real_estimate_gzip = av.GzipEstimator, av.estimate_gzip
+
+        def counting_estimator(size, ext):
+            estimated.append(ext)
+            return real_estimator(size, ext)
+
+        def counting_estimate_gzip(path, size, ext):
+            estimated.append(ext)
+            return real_estimate_gzip(path, size, ext)
+
+        with tempfile.TemporaryDirectory() as root:
+            dist = os.path.join(root, "dist")
+            write_files(dist, {"index.html": '<script src="js/main.js"></script>', "js/main.js": "var a = 1;",
+                               "img/logo.png": "png"})
+            with mock.patch.object(av, "GzipEstimator", counting_estimator), \
+                    mock.patch.object(av, "estimate_gzip", counting_estimate_gzip):
+                report = run_report(root, dist, **kwargs)
+        return report, estimated
+
+    def test_no_gzip_work_without_budgets(self):
+        report, estimated = self.run_counting()
+        self.assertEqual(estimated, [])
+        self.assertIn("note", report["transfer"])
+        self.assertIsNone(report["precache_plan"]["tiers"][0]["gzip_bytes"])
+        self.assertEqual(report["integrity"]["hashing"]["files"], 3)
+
+    def test_budget_enables_audit(self):
+        report, estimated = self.run_counting(budgets={"transfer_mb": 1})
+        self.assertEqual(sorted(estimated), [".html", ".js", ".png"])
+        self.assertEqual(report["transfer"]["budget"]["exceeded"], [])
+        self.assertEqual(report["transfer"]["raw_bytes"], report["dist_bytes"])
+
+
+if __name__ == '__main__':
+    unittest.main()